@@ -10,8 +10,8 @@ from .py_shell import (
     _ORD_FKEY_START,
     _ORD_LF,
     _ORD_NUL,
-    _ORD_OPEN_BRACKET,
     _ORD_SEMICOLON,
+    _ORD_SPACE,
     PromptSession,
 )
 
@@ -20,6 +20,10 @@ try:  # noqa: SIM105 -- contextlib is not available for CircuitPython
 except ImportError:
     pass
 
+_ORD_ZERO = ord("0")
+_ORD_UPPER_R = ord("R")
+_CSI_CURSOR_POSITION_QUERY = b"\x1b[6n"  # ESC[6n to report the cursor position
+
 _PRINTABLE_FOR_NONPRINTABLE = {
     _ORD_NUL: "(0)",
     _ORD_FKEY_START: "(F)",
@@ -32,6 +36,12 @@ _PRINTABLE_FOR_NONPRINTABLE = {
     _ORD_DEL: "DEL",
 }
 
+# https://ss64.com/ascii.html
+_DEBUG_STR_FOR_ORD = tuple(
+    chr(char_ord) if _ORD_SPACE <= char_ord < _ORD_DEL else _PRINTABLE_FOR_NONPRINTABLE.get(char_ord, "?")
+    for char_ord in range(256)
+)
+
 
 class TracedReader:
     """A stream reader that logs bytes read from the stream."""
@@ -47,6 +57,16 @@ class TracedReader:
         self._log_prefix = log_prefix if log_prefix is not None else type(self)
         self._trace(f"tracing input from {type(input_stream)}")
 
+    @property
+    def in_waiting(self) -> int:
+        """
+        Return the number of bytes waiting to be read from the input_stream.
+
+        Raises AttributeError like the input_stream when it does not report them,
+        so readers that check for in_waiting treat both streams the same way.
+        """
+        return self._input_stream.in_waiting  # type: ignore -- only serial ports report in_waiting
+
     def read(self, byte_count: int) -> bytes:
         """Read from the input_stream and log it."""
         input_chars = self._input_stream.read(byte_count)
@@ -83,20 +103,29 @@ class TracedWriter:
 class IOTracer:
     """An IO stream tracer that logs bytes read from and written to the streams."""
 
-    def __init__(self, input_stream: BinaryIO, output_stream: BinaryIO) -> None:
-        """Create an IOTracer that logs all IO with input_stream and output_stream."""
+    def __init__(self, input_stream: BinaryIO, output_stream: BinaryIO, enabled: bool = True) -> None:
+        """
+        Create an IOTracer that logs all IO with input_stream and output_stream.
+
+        If you set enabled to False, the tracer hands out the original streams so that
+        reads and writes cost nothing extra, and the traced_io_log stays empty.
+        """
         self._shared_tracelog = []
-        self._traced_input = TracedReader(input_stream, self._shared_tracelog, log_prefix="")
-        self._traced_output = TracedWriter(output_stream, self._shared_tracelog, log_prefix="")
+        if enabled:
+            self._traced_input = TracedReader(input_stream, self._shared_tracelog, log_prefix="")
+            self._traced_output = TracedWriter(output_stream, self._shared_tracelog, log_prefix="")
+        else:
+            self._traced_input = input_stream
+            self._traced_output = output_stream
 
     @property
-    def input_stream(self) -> TracedReader:
-        """Return the TracedReader used by the IOTracer."""
+    def input_stream(self) -> TracedReader | BinaryIO:
+        """Return the TracedReader used by the IOTracer, or the original stream when tracing is disabled."""
         return self._traced_input
 
     @property
-    def output_stream(self) -> TracedWriter:
-        """Return the TracedWriter used by the IOTracer."""
+    def output_stream(self) -> TracedWriter | BinaryIO:
+        """Return the TracedWriter used by the IOTracer, or the original stream when tracing is disabled."""
         return self._traced_output
 
     @property
@@ -131,11 +160,11 @@ class TracedSession:
 
     def prompt(self, message: str) -> bytes:
         """Prompt the user for input with the given message."""
-        response = self._session.prompt(message)
+        response = self._session.prompt_bytes(message)
         if self._autoecho and self._tracer.traced_io_log:
             _ = [print(entry) for entry in self._tracer.traced_io_log]  # noqa: T201 -- use builtin to bypass self-tracing
             self._tracer.clear_log()
-        return response.encode("UTF-8")
+        return response
 
     @property
     def tracer(self) -> IOTracer:
@@ -146,41 +175,60 @@ class TracedSession:
 def is_printable(char_ord: int) -> bool:
     """Return true if the specified ordinal is printable in a terminal."""
     # https://ss64.com/ascii.html
-    return char_ord > 31 and char_ord < 127  # noqa: PLR2004 -- ordinals /are/ magic numbers
+    return _ORD_SPACE <= char_ord < _ORD_DEL
 
 
 def debug_str(in_ordinal: int) -> str:
     """Return a printable substitute for a non-printable ordinal."""
-    return chr(in_ordinal) if is_printable(in_ordinal) else _PRINTABLE_FOR_NONPRINTABLE.get(in_ordinal, "?")
-
-
-def console_query(
-    query_sequence_ords: list[int], out_stream: BinaryIO, in_stream: BinaryIO, stop_ord: int
-) -> list[int]:
-    """Send the query_sequence_ords to the remote console and return its response."""
-    out_stream.write(bytes(query_sequence_ords))
+    if not 0 <= in_ordinal < len(_DEBUG_STR_FOR_ORD):
+        return "?"
+    return _DEBUG_STR_FOR_ORD[in_ordinal]
+
+
+def console_query(query_sequence: bytes, out_stream: BinaryIO, in_stream: BinaryIO, stop_ord: int) -> bytes:
+    """Send the query_sequence to the remote console and return its response."""
+    out_stream.write(query_sequence)
+    read_until = getattr(in_stream, "read_until", None)
+    if read_until is not None:
+        # pyserial's Serial reads through the terminator in one call and stops there
+        return bytes(read_until(bytes((stop_ord,))))
+    # Otherwise read one byte at a time: the console blocks until more input arrives, and
+    # any bytes after stop_ord belong to the user, not to this query
+    response = bytearray()
     in_ord = _ORD_NUL
-    response_ords = []
     while in_ord != stop_ord:
-        in_char = in_stream.read(1)
-        in_ord = ord(in_char)
-        response_ords.append(in_ord)
-    return response_ords
+        in_bytes = in_stream.read(1)
+        response.extend(in_bytes)
+        in_ord = in_bytes[0]
+    return bytes(response)
+
+
+def get_cursor_position(output: BinaryIO, in_stream: BinaryIO) -> tuple[int, int]:
+    """Get the cursor row and column from the remote console."""
+    cursor_position_response = _query_cursor_position(output, in_stream)
+    # Full response has format ESC[#;#R
+    row, column = cursor_position_response[2:-1].split(b";")
+    return int(row), int(column)
 
 
 def get_cursor_column(output: BinaryIO, in_stream: BinaryIO) -> int:
     """Get the cursor column from the remote console."""
-    cursor_position_codes = console_query(
-        query_sequence_ords=[_ORD_ESC, _ORD_OPEN_BRACKET, ord("6"), ord("n")],
-        out_stream=output,
-        in_stream=in_stream,
-        stop_ord=ord("R"),
-    )
-    # Full response has format ESC[#;#R
-    clipped = cursor_position_codes[2:-1]
-    semicolon_index = clipped.index(_ORD_SEMICOLON)
-    column_ords = clipped[semicolon_index + 1 :]
-    return int(bytes(column_ords))
+    output.write(_CSI_CURSOR_POSITION_QUERY)
+    # Full response has format ESC[#;#R, so skip through the semicolon and add up the column digits until the R
+    in_ord = _ORD_NUL
+    while in_ord != _ORD_SEMICOLON:
+        in_ord = in_stream.read(1)[0]
+    column = 0
+    in_ord = in_stream.read(1)[0]
+    while in_ord != _ORD_UPPER_R:
+        column = column * 10 + in_ord - _ORD_ZERO
+        in_ord = in_stream.read(1)[0]
+    return column
+
+
+def _query_cursor_position(output: BinaryIO, in_stream: BinaryIO) -> bytes:
+    """Send the device status report query ESC[6n and return the cursor position response."""
+    return console_query(_CSI_CURSOR_POSITION_QUERY, output, in_stream, _ORD_UPPER_R)
 
 
 # Can we use input() to get a whole client-side edited line?
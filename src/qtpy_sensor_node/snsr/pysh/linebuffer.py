@@ -11,36 +11,72 @@ class LineBuffer:
         self._first_terminal_column = 1
         self.prompt_length = prompt_length
         self.tab_size = tab_size
-        self.ord_codes = []
+        # CircuitPython's bytearray has no insert() or pop(), so edits use slice assignment
+        self.ord_codes = bytearray()
+        # The terminal column for each input cursor position, from 0 through len(ord_codes)
+        self._columns = [self._first_terminal_column + prompt_length]
         self.input_cursor = 0
-        self.terminal_column = self._get_column_at_cursor()
+        self.terminal_column = self._columns[0]
+
+    def reset(self, prompt_length: int) -> None:
+        """Empty the buffer for a new prompt of prompt_length, keeping its allocated storage."""
+        self.prompt_length = prompt_length
+        self.ord_codes[:] = b""
+        self._columns[:] = [self._first_terminal_column + prompt_length]
+        self.input_cursor = 0
+        self.terminal_column = self._columns[0]
 
     def has_bytes(self) -> bool:
         """Return whether the buffer has contents."""
-        return len(self.ord_codes) > 0
+        return bool(self.ord_codes)
+
+    def get_bytes(self) -> bytes:
+        """Get a copy of the buffer without decoding it."""
+        return bytes(self.ord_codes)
 
     def get_decoded_bytes(self) -> str:
         """Get the buffer as a UTF-8 string."""
-        return bytes(self.ord_codes).decode("UTF-8")
+        return self.ord_codes.decode("UTF-8")
 
     def get_terminal_column(self) -> int:
         """Return the terminal column of the input cursor."""
         return self.terminal_column
 
-    def accept(self, ord_code: int) -> tuple[int, list[int]]:
+    def accept(self, ord_code: int) -> tuple[int, bytearray]:
         """
         Insert a new ordinate at the input cursor.
 
         Returns a tuple of the new terminal column and a slice of the
         input buffer from the new ordinate to the end of the buffer.
         """
-        self.ord_codes.insert(self.input_cursor, ord_code)
+        if self.input_cursor == len(self.ord_codes):
+            # Typing at the end of the line is the common case and does not shift the buffer
+            self.ord_codes.append(ord_code)
+            self._columns.append(self._advance_column_for_code(self.terminal_column, ord_code))
+        else:
+            self.ord_codes[self.input_cursor : self.input_cursor] = bytes((ord_code,))
+            self._update_columns_after_cursor()
         code_with_remaining_line = self.ord_codes[self.input_cursor :]
         self.input_cursor += 1
-        self.terminal_column = self._get_column_at_cursor()
+        self.terminal_column = self._columns[self.input_cursor]
         return self.terminal_column, code_with_remaining_line
 
-    def delete(self) -> tuple[int, list[int]]:
+    def accept_many(self, ord_codes: bytes) -> tuple[int, bytearray]:
+        """
+        Insert several new ordinates at the input cursor.
+
+        Returns a tuple of the new terminal column and a slice of the
+        input buffer from the first new ordinate to the end of the buffer.
+        """
+        first_new_code = self.input_cursor
+        self.ord_codes[first_new_code:first_new_code] = ord_codes
+        self._update_columns_after_cursor()
+        codes_with_remaining_line = self.ord_codes[first_new_code:]
+        self.input_cursor += len(ord_codes)
+        self.terminal_column = self._columns[self.input_cursor]
+        return self.terminal_column, codes_with_remaining_line
+
+    def delete(self) -> tuple[int, bytearray]:
         """
         Delete the ordinate after the input cursor.
 
@@ -48,18 +84,27 @@ class LineBuffer:
         input buffer from the cursor to the end of the buffer.
         """
         if self.input_cursor < len(self.ord_codes):
-            _ = self.ord_codes.pop(self.input_cursor)
-            self.terminal_column = self._get_column_at_cursor()
+            # The codes before the cursor did not change, so neither did its column
+            self.ord_codes[self.input_cursor : self.input_cursor + 1] = b""
+            self._update_columns_after_cursor()
         remaining_line = self.ord_codes[self.input_cursor :]
         return self.terminal_column, remaining_line
 
-    def backspace(self) -> tuple[int, list[int]]:
+    def backspace(self) -> tuple[int, bytearray]:
         """
         Delete the ordinate before the input cursor.
 
         Returns a tuple of the new terminal column and a slice of the
         input buffer from the cursor to the end of the buffer.
         """
+        if self.ord_codes and self.input_cursor == len(self.ord_codes):
+            # Backspacing at the end of the line does not shift the buffer
+            self.ord_codes[-1:] = b""
+            self._columns.pop()
+            self.input_cursor -= 1
+            self.terminal_column = self._columns[self.input_cursor]
+            return self.terminal_column, bytearray()
+
         old_column = self.terminal_column
         new_column = self.move_left()
         if new_column != old_column:
@@ -74,7 +119,7 @@ class LineBuffer:
         Returns the new terminal column of the input cursor.
         """
         self.input_cursor = 0
-        self.terminal_column = self._get_column_at_cursor()
+        self.terminal_column = self._columns[0]
         return self.terminal_column
 
     def move_end(self) -> int:
@@ -84,7 +129,7 @@ class LineBuffer:
         Returns the new terminal column of the input cursor.
         """
         self.input_cursor = len(self.ord_codes)
-        self.terminal_column = self._get_column_at_cursor()
+        self.terminal_column = self._columns[self.input_cursor]
         return self.terminal_column
 
     def move_left(self) -> int:
@@ -94,9 +139,8 @@ class LineBuffer:
         Returns the new terminal column of the input cursor.
         """
         if self.input_cursor > 0:
-            move_distance = self._get_column_move_distance_for_cursor_move(-1)
             self.input_cursor -= 1
-            self.terminal_column -= move_distance
+            self.terminal_column = self._columns[self.input_cursor]
         return self.terminal_column
 
     def move_right(self) -> int:
@@ -106,31 +150,23 @@ class LineBuffer:
         Returns the new terminal column of the input cursor.
         """
         if self.input_cursor < len(self.ord_codes):
-            move_distance = self._get_column_move_distance_for_cursor_move(1)
             self.input_cursor += 1
-            self.terminal_column += move_distance
+            self.terminal_column = self._columns[self.input_cursor]
         return self.terminal_column
 
-    def _get_column_at_cursor(self) -> int:
-        codes_to_cursor = self.ord_codes[: self.input_cursor]
-        column = self._calculate_column_for_codes(codes_to_cursor)
-        return column
-
-    def _get_column_move_distance_for_cursor_move(self, cursor_move: int) -> int:
-        index_after_move = self.input_cursor + cursor_move
-        codes_after_move = self.ord_codes[:index_after_move]
-        new_column = self._calculate_column_for_codes(codes_after_move)
-        return abs(self.terminal_column - new_column)
-
-    def _calculate_column_for_codes(self, codes: list[int]) -> int:
-        first_user_column = self._first_terminal_column + self.prompt_length
-        terminal_column = first_user_column
-        for ord_code in codes:
-            if ord_code == ORD_TAB:
-                one_based_x = terminal_column - self._first_terminal_column
-                one_based_remainder = one_based_x % self.tab_size
-                to_next_tab_stop = self.tab_size - one_based_remainder
-                terminal_column += to_next_tab_stop
-            else:
-                terminal_column += 1
-        return terminal_column
+    def _update_columns_after_cursor(self) -> None:
+        # Tab widths depend on the codes before them, so recalculate every column after an edit at the cursor
+        columns = self._columns
+        del columns[self.input_cursor + 1 :]
+        terminal_column = columns[self.input_cursor]
+        for ord_code in self.ord_codes[self.input_cursor :]:
+            terminal_column = self._advance_column_for_code(terminal_column, ord_code)
+            columns.append(terminal_column)
+
+    def _advance_column_for_code(self, terminal_column: int, ord_code: int) -> int:
+        if ord_code == ORD_TAB:
+            one_based_x = terminal_column - self._first_terminal_column
+            one_based_remainder = one_based_x % self.tab_size
+            to_next_tab_stop = self.tab_size - one_based_remainder
+            return terminal_column + to_next_tab_stop
+        return terminal_column + 1
@@ -9,6 +9,17 @@ try:  # noqa: SIM105 -- contextlib is not available for CircuitPython
 except ImportError:
     pass
 
+try:
+    from micropython import const  # type: ignore -- micropython is only available on CircuitPython
+except ImportError:
+
+    def const(value: int) -> int:
+        """Return value unchanged on CPython, where there is no compiler support for constants."""
+        return value
+
+
+# CircuitPython folds a private const() into the bytecode and does not create a module global for it,
+# so only wrap names that other modules do not import.
 _ORD_NUL = 0x00
 _ORD_FKEY_START = 0x01
 _ORD_BACKSPACE = 0x08
@@ -19,11 +30,23 @@ _ORD_ESC = 0x1B
 _ORD_SPACE = 0x20
 _ORD_SEMICOLON = 0x3B
 _ORD_OPEN_BRACKET = 0x5B
-_ORD_LOWER_B = 0x62
-_ORD_TILDE = 0x7E
+_ORD_LOWER_B = const(0x62)
+_ORD_TILDE = const(0x7E)
 _ORD_DEL = 0x7F
 
-_NOOP_ORDS = [
+_CSI = b"\x1b["  # ESC[ is the control sequence introducer
+_CSI_ERASE_TO_EOL = b"\x1b[0K"  # ESC[0K to erase from cursor to end of line
+_CSI_HIDE_CURSOR = b"\x1b[?25l"  # ESC[?25l to make cursor invisible
+_CSI_SHOW_CURSOR = b"\x1b[?25h"  # ESC[?25h to make cursor visible
+_CSI_CURSOR_FORWARD = b"\x1b[C"  # ESC[C to move the cursor one column right
+_CSI_CURSOR_BACK = b"\x1b[D"  # ESC[D to move the cursor one column left
+
+# Editing a line sets the cursor to the same few columns over and over, so keep their control sequences
+_SET_CURSOR_COLUMN_SEQUENCES = {}
+_MAX_SET_CURSOR_COLUMN_SEQUENCES = const(128)
+
+# Only read at import to build the state transition table, so a tuple is enough
+_NOOP_ORDS = (
     # 0x00
     # 0x01
     0x02,
@@ -56,28 +79,58 @@ _NOOP_ORDS = [
     0x1D,
     0x1E,
     0x1F,
-]
+)
 
+# Each input byte moves the prompt through a state machine that recognizes these control sequences
 # fmt: off
-_CONTROL_PATTERN_NONE = 0
-_CONTROL_PATTERN_MOVE_CURSOR_KEY = 1  # up, down, right, left, end, home: code 0x1B then '['  then the single-ord command: one of [ABCDFH]
-_CONTROL_PATTERN_EDITOR_KEY = 2       # Ins Del PgUp PgDown             : code 0x1B then '['  then the single-ord command: one of [2356]                 then the close '~'
-_CONTROL_PATTERN_LOWER_F_KEY = 3      # F1..F4                          : code 0x01 then 'bO' then the single-ord command: one of [PQRS]
-_CONTROL_PATTERN_UPPER_F_KEY = 4      # F5..F12                         : code 0x01 then 'b[' then the   dual-ord command:        [1][5789] or [2][0123] then the close '~'
+_STATE_TEXT = const(0)           # not in a control sequence: accept, erase, or end the line
+_STATE_ESC = const(1)            # read 0x1B
+_STATE_FKEY = const(2)           # read 0x01
+_STATE_CSI = const(3)            # up, down, right, left, end, home: code 0x1B then '['  then the single-ord command: one of [ABCDFH]
+_STATE_EDITOR_KEY = const(4)     # Ins PgUp PgDown                  : code 0x1B then '['  then the single-ord command: one of [256]                  then the close '~'
+_STATE_DELETE_KEY = const(5)     # Del                              : code 0x1B then '['  then the single-ord command: '3'                            then the close '~'
+_STATE_FKEY_B = const(6)         # read 0x01 then 'b'
+_STATE_LOWER_F_KEY = const(7)    # F1..F4                           : code 0x01 then 'bO' then the single-ord command: one of [PQRS]
+_STATE_UPPER_F_KEY = const(8)    # F5..F12                          : code 0x01 then 'b[' then the   dual-ord command:        [1][5789] or [2][0123] then the close '~'
+_STATE_UNTIL_TILDE = const(9)    # read and discard until the close '~'
+_STATE_COUNT = const(10)
+
+_ACTION_NONE = const(0)          # part of a control sequence
+_ACTION_IGNORE = const(1)        # user input without a handler
+_ACTION_ACCEPT = const(2)
+_ACTION_BACKSPACE = const(3)
+_ACTION_END_OF_LINE = const(4)
+_ACTION_DELETE = const(5)
+_ACTION_MOVE_RIGHT = const(6)
+_ACTION_MOVE_LEFT = const(7)
+_ACTION_MOVE_END = const(8)
+_ACTION_MOVE_HOME = const(9)
 # fmt: on
 
-_PREVIOUS_ORD = _ORD_NUL
+# A transition packs the action into the high nibble and the next state into the low nibble
+_ACTION_SHIFT = const(4)
+_STATE_MASK = const(0x0F)
 
 
 class InMemoryHistory:
-    """An in-memory history of commands, infinite in size."""
+    """An in-memory history of commands, bounded in size."""
 
-    def __init__(self) -> None:
-        """Create a new in-memory history buffer."""
+    def __init__(self, max_entries: int = 256) -> None:
+        """Create a new in-memory history buffer that keeps the most recent max_entries commands."""
+        self._max_entries = max_entries
         self._history = []
 
     def append_string(self, string: str) -> None:
-        """Append a string to the history of commands."""
+        """
+        Append a string to the history of commands, discarding the oldest when the history is full.
+
+        A repeated command moves to the end of the history instead of taking a second entry.
+        """
+        # Use a list because CircuitPython's deque requires maxlen and is not iterable on every build
+        if string in self._history:
+            self._history.remove(string)
+        elif len(self._history) >= self._max_entries:
+            self._history.pop(0)
         self._history.append(string)
 
     def get_strings(self) -> list[str]:
@@ -85,6 +138,36 @@ class InMemoryHistory:
         return self._history
 
 
+class _InputReader:
+    """A console reader that returns all waiting input at once and keeps any bytes read past the end of a line."""
+
+    def __init__(self, in_stream: BinaryIO, read_waiting: bool = True) -> None:
+        """
+        Create an _InputReader for in_stream.
+
+        If you set read_waiting to False, the reader takes one byte at a time so that it never
+        consumes input after the end of a line, for callers that cannot keep it for the next prompt.
+        """
+        self._read = in_stream.read
+        # usb_cdc.Serial reports how many bytes are waiting, other streams are read one byte at a time
+        self._waiting_stream = in_stream if read_waiting and hasattr(in_stream, "in_waiting") else None
+        self._pending = b""
+
+    def read(self) -> bytes:
+        """Return the pending bytes, or block until input arrives and return all that is waiting."""
+        if self._pending:
+            chunk = self._pending
+            self._pending = b""
+            return chunk
+        if self._waiting_stream is not None:
+            return self._read(self._waiting_stream.in_waiting or 1)  # type: ignore -- only serial ports report in_waiting
+        return self._read(1)
+
+    def unread(self, remaining: bytes) -> None:
+        """Keep the remaining bytes for the next read."""
+        self._pending = remaining
+
+
 class PromptSession:
     """A shell-like session for multiple interactive prompts that supports line editing and command history."""
 
@@ -100,48 +183,73 @@ class PromptSession:
         self.in_stream = in_stream
         self.out_stream = out_stream
         self.history = history if history else InMemoryHistory()
+        self._previous_ord = _ORD_NUL
+        self._message = default_prompt
+        self._message_bytes = default_prompt.encode("UTF-8")
+        self._key_codes = LineBuffer(prompt_length=len(default_prompt))
+        self._reader = _InputReader(in_stream)
 
     def prompt(self, message: str | None = None) -> str:
         """Prompt the user for input with the given message or the default message."""
+        return self.prompt_bytes(message).decode("UTF-8")
+
+    def prompt_bytes(self, message: str | None = None) -> bytes:
+        """Prompt the user for input with the given message or the default message and return the undecoded response."""
         message = message if message else self.default_prompt
+        if message != self._message:
+            # Shells usually prompt with the same message every time, so only encode a new one
+            self._message = message
+            self._message_bytes = message.encode("UTF-8")
 
-        decoded = _prompt(message, in_stream=self.in_stream, out_stream=self.out_stream, history=self.history)
+        response, self._previous_ord = _prompt(
+            message,
+            in_stream=self.in_stream,
+            out_stream=self.out_stream,
+            history=self.history,
+            previous_ord=self._previous_ord,
+            message_bytes=self._message_bytes,
+            key_codes=self._key_codes,
+            reader=self._reader,
+        )
 
-        return decoded
+        return response
 
 
 def prompt(message: str = "", *, in_stream: BinaryIO, out_stream: BinaryIO) -> str:
-    """Prompt the user for input with the given message."""
-    return _prompt(message, in_stream, out_stream)
+    """
+    Prompt the user for input with the given message.
 
+    Use a PromptSession to prompt more than once on a console that sends CRLF line endings
+    or to keep input that arrives after the end of the line.
+    """
+    return prompt_bytes(message, in_stream=in_stream, out_stream=out_stream).decode("UTF-8")
 
-def _set_cursor_column(new_column: int, output: BinaryIO) -> None:
-    """Set the cursor column in the remote console."""
-    # ESC[##G to set cursor column
-    column_number = [ord(x) for x in list(str(new_column))]
-    column_number.append(ord("G"))
-    _console_csi_command(column_number, output)
 
+def prompt_bytes(message: str = "", *, in_stream: BinaryIO, out_stream: BinaryIO) -> bytes:
+    """
+    Prompt the user for input with the given message and return the undecoded response.
 
-def _hide_cursor(output: BinaryIO) -> None:
-    """Hide the cursor in the remote console."""
-    # ESC[?25l to make cursor invisible
-    hide_cursor = [ord(x) for x in list("?25l")]
-    _console_csi_command(hide_cursor, output)
+    Use a PromptSession to prompt more than once on a console that sends CRLF line endings
+    or to keep input that arrives after the end of the line.
+    """
+    response, _ = _prompt(message, in_stream, out_stream)
+    return response
 
 
-def _show_cursor(output: BinaryIO) -> None:
-    """Show the cursor in the remote console."""
-    # ESC[?25h to make cursor visible
-    show_cursor = [ord(x) for x in list("?25h")]
-    _console_csi_command(show_cursor, output)
+def _set_cursor_column(new_column: int, output: BinaryIO) -> None:
+    """Set the cursor column in the remote console."""
+    output.write(_set_cursor_column_sequence(new_column))
 
 
-def _console_csi_command(command_sequence_ords: list[int], output: BinaryIO) -> None:
-    """Send a command prefixed with the control sequence introducer 'ESC ['."""
-    full_command = [_ORD_ESC, _ORD_OPEN_BRACKET]
-    full_command.extend(command_sequence_ords)
-    output.write(bytes(full_command))
+def _set_cursor_column_sequence(new_column: int) -> bytes:
+    """Return the control sequence that sets the cursor column."""
+    sequence = _SET_CURSOR_COLUMN_SEQUENCES.get(new_column)
+    if sequence is None:
+        # ESC[##G to set cursor column
+        sequence = _CSI + str(new_column).encode("UTF-8") + b"G"
+        if len(_SET_CURSOR_COLUMN_SEQUENCES) < _MAX_SET_CURSOR_COLUMN_SEQUENCES:
+            _SET_CURSOR_COLUMN_SEQUENCES[new_column] = sequence
+    return sequence
 
 
 # Room for improvement -- see GitHub Issue #30
@@ -152,148 +260,271 @@ def _console_csi_command(command_sequence_ords: list[int], output: BinaryIO) ->
 #   - untested
 # Insert empty columns and fill them with new input characters
 # - CSI Ps @  Insert Ps (Blank) Character(s) (default = 1)
-def _redraw_from_column(from_column: int, ords_to_draw: list[int], output: BinaryIO) -> None:
-    """Erase the line starting at from_column and redraw ords_to_draw."""
-    _set_cursor_column(from_column, output)
+def _redraw_from_column(from_column: int, ords_to_draw: bytearray, cursor_column: int, output: BinaryIO) -> None:
+    """Erase the line starting at from_column, redraw ords_to_draw, then place the cursor at cursor_column."""
+    # Send the whole redraw in one write so the console receives it in one transfer
+    output.write(
+        b"".join(
+            (
+                _CSI_HIDE_CURSOR,
+                _set_cursor_column_sequence(from_column),
+                _CSI_ERASE_TO_EOL,
+                ords_to_draw,
+                _set_cursor_column_sequence(cursor_column),
+                _CSI_SHOW_CURSOR,
+            )
+        )
+    )
+
+
+def _build_transition_table() -> tuple[bytes, ...]:
+    """Build one 256-byte table of packed transitions per state, indexed by the input ordinal."""
+    tables = []
+    for _ in range(_STATE_COUNT):
+        tables.append(bytearray(256))
+
+    def set_transitions(
+        state: int, ords: bytes | list[int] | tuple[int, ...] | range, next_state: int, action: int
+    ) -> None:
+        transition = (action << _ACTION_SHIFT) | next_state
+        table = tables[state]
+        for in_ord in ords:
+            table[in_ord] = transition
+
+    all_ords = range(256)
+
+    # Accept the user's input character, but begin control sequences, handle backspace, and end the line
+    set_transitions(_STATE_TEXT, all_ords, _STATE_TEXT, _ACTION_ACCEPT)
+    set_transitions(_STATE_TEXT, _NOOP_ORDS, _STATE_TEXT, _ACTION_IGNORE)
+    set_transitions(_STATE_TEXT, [_ORD_BACKSPACE], _STATE_TEXT, _ACTION_BACKSPACE)
+    set_transitions(_STATE_TEXT, [_ORD_CR, _ORD_LF], _STATE_TEXT, _ACTION_END_OF_LINE)
+    set_transitions(_STATE_TEXT, [_ORD_ESC], _STATE_ESC, _ACTION_NONE)
+    set_transitions(_STATE_TEXT, [_ORD_FKEY_START], _STATE_FKEY, _ACTION_NONE)
+
+    # No handlers for other command sequences, so their second ordinal is discarded
+    set_transitions(_STATE_ESC, all_ords, _STATE_TEXT, _ACTION_NONE)
+    set_transitions(_STATE_ESC, [_ORD_OPEN_BRACKET], _STATE_CSI, _ACTION_NONE)
+    set_transitions(_STATE_FKEY, all_ords, _STATE_TEXT, _ACTION_NONE)
+    set_transitions(_STATE_FKEY, [_ORD_LOWER_B], _STATE_FKEY_B, _ACTION_NONE)
+
+    # A letter or symbol completes ESC[*, a digit begins an editor command
+    set_transitions(_STATE_CSI, all_ords, _STATE_TEXT, _ACTION_NONE)
+    set_transitions(_STATE_CSI, b"0123456789", _STATE_EDITOR_KEY, _ACTION_NONE)
+    set_transitions(_STATE_CSI, b"3", _STATE_DELETE_KEY, _ACTION_NONE)
+    set_transitions(_STATE_CSI, b"C", _STATE_TEXT, _ACTION_MOVE_RIGHT)
+    set_transitions(_STATE_CSI, b"D", _STATE_TEXT, _ACTION_MOVE_LEFT)
+    set_transitions(_STATE_CSI, b"F", _STATE_TEXT, _ACTION_MOVE_END)
+    set_transitions(_STATE_CSI, b"H", _STATE_TEXT, _ACTION_MOVE_HOME)
+
+    # Editor commands are '~' terminated, and only Delete has a handler
+    set_transitions(_STATE_EDITOR_KEY, all_ords, _STATE_UNTIL_TILDE, _ACTION_NONE)
+    set_transitions(_STATE_EDITOR_KEY, [_ORD_TILDE], _STATE_TEXT, _ACTION_NONE)
+    set_transitions(_STATE_DELETE_KEY, all_ords, _STATE_UNTIL_TILDE, _ACTION_NONE)
+    set_transitions(_STATE_DELETE_KEY, [_ORD_TILDE], _STATE_TEXT, _ACTION_DELETE)
+
+    # No handlers for F-key codes: lower F-keys are fixed length, upper F-keys are '~' terminated after the first command ordinal
+    set_transitions(_STATE_FKEY_B, all_ords, _STATE_LOWER_F_KEY, _ACTION_NONE)
+    set_transitions(_STATE_FKEY_B, [_ORD_OPEN_BRACKET], _STATE_UPPER_F_KEY, _ACTION_NONE)
+    set_transitions(_STATE_LOWER_F_KEY, all_ords, _STATE_TEXT, _ACTION_NONE)
+    set_transitions(_STATE_UPPER_F_KEY, all_ords, _STATE_UNTIL_TILDE, _ACTION_NONE)
+
+    set_transitions(_STATE_UNTIL_TILDE, all_ords, _STATE_UNTIL_TILDE, _ACTION_NONE)
+    set_transitions(_STATE_UNTIL_TILDE, [_ORD_TILDE], _STATE_TEXT, _ACTION_NONE)
+
+    return tuple(bytes(table) for table in tables)
+
+
+def _act_nothing(in_ord: int, key_codes: LineBuffer, out_stream: BinaryIO) -> None:
+    """Read the ordinal without changing the line."""
+
+
+def _act_accept(in_ord: int, key_codes: LineBuffer, out_stream: BinaryIO) -> None:
+    """Accept the user's input character."""
+    old_column = key_codes.terminal_column
+    new_column, codes_to_redraw = key_codes.accept(in_ord)
+    if len(codes_to_redraw) == 1 and _ORD_SPACE <= in_ord < _ORD_DEL:
+        # Typing a printable character at the end of the line only needs the character
+        out_stream.write(codes_to_redraw)
+        return
+    _redraw_from_column(old_column, codes_to_redraw, new_column, out_stream)
+
+
+def _accept_from(in_bytes: bytes, read_index: int, key_codes: LineBuffer, out_stream: BinaryIO) -> int:
+    """
+    Accept the user's input character at read_index and any printable characters after it in the same read.
+
+    Returns the index of the first byte in in_bytes that was not accepted.
+    """
+    in_ord = in_bytes[read_index]
+    next_index = read_index + 1
+    if _ORD_SPACE <= in_ord < _ORD_DEL:
+        in_length = len(in_bytes)
+        while next_index < in_length and _ORD_SPACE <= in_bytes[next_index] < _ORD_DEL:
+            next_index += 1
+    if next_index - read_index == 1:
+        _act_accept(in_ord, key_codes, out_stream)
+        return next_index
+
+    # Pasted text arrives in one read, so insert it with one buffer edit and one write
+    in_ords = in_bytes[read_index:next_index]
+    old_column = key_codes.terminal_column
+    new_column, codes_to_redraw = key_codes.accept_many(in_ords)
+    if len(codes_to_redraw) == len(in_ords):
+        # Pasting at the end of the line only needs the characters
+        out_stream.write(codes_to_redraw)
+    else:
+        _redraw_from_column(old_column, codes_to_redraw, new_column, out_stream)
+    return next_index
+
+
+def _act_backspace(in_ord: int, key_codes: LineBuffer, out_stream: BinaryIO) -> None:
+    """Erase the character before the cursor."""
+    cursor_column, codes_to_redraw = key_codes.backspace()
+    _redraw_from_column(cursor_column, codes_to_redraw, cursor_column, out_stream)
+
+
+def _act_delete(in_ord: int, key_codes: LineBuffer, out_stream: BinaryIO) -> None:
+    """Erase the character at the cursor."""
+    cursor_column, codes_to_redraw = key_codes.delete()
+    _redraw_from_column(cursor_column, codes_to_redraw, cursor_column, out_stream)
+
+
+def _act_move_right(in_ord: int, key_codes: LineBuffer, out_stream: BinaryIO) -> None:
+    """Move the cursor one character to the right."""
+    old_column = key_codes.terminal_column
+    _move_cursor_to_column(old_column, key_codes.move_right(), out_stream)
+
+
+def _act_move_left(in_ord: int, key_codes: LineBuffer, out_stream: BinaryIO) -> None:
+    """Move the cursor one character to the left."""
+    old_column = key_codes.terminal_column
+    _move_cursor_to_column(old_column, key_codes.move_left(), out_stream)
+
+
+def _act_move_end(in_ord: int, key_codes: LineBuffer, out_stream: BinaryIO) -> None:
+    """Move the cursor to the end of the line."""
+    old_column = key_codes.terminal_column
+    _move_cursor_to_column(old_column, key_codes.move_end(), out_stream)
+
+
+def _act_move_home(in_ord: int, key_codes: LineBuffer, out_stream: BinaryIO) -> None:
+    """Move the cursor to the start of the line."""
+    old_column = key_codes.terminal_column
+    _move_cursor_to_column(old_column, key_codes.move_home(), out_stream)
+
+
+def _move_cursor_to_column(old_column: int, new_column: int, output: BinaryIO) -> None:
+    """Set the cursor column in the remote console if it moved."""
+    # Most moves are one column, which has a fixed control sequence
+    if new_column == old_column + 1:
+        output.write(_CSI_CURSOR_FORWARD)
+    elif new_column == old_column - 1:
+        output.write(_CSI_CURSOR_BACK)
+    elif new_column != old_column:
+        _set_cursor_column(new_column, output)
+
 
-    # ESC[0K to erase from cursor to end of line
-    erase_to_eol = [ord(x) for x in list("0K")]
-    _console_csi_command(erase_to_eol, output)
+_TRANSITIONS = _build_transition_table()
 
-    output.write(bytes(ords_to_draw))
+# Indexed by the _ACTION_* constants
+_ACTIONS = (
+    _act_nothing,  # _ACTION_NONE
+    _act_nothing,  # _ACTION_IGNORE
+    _act_accept,  # _ACTION_ACCEPT
+    _act_backspace,  # _ACTION_BACKSPACE
+    _act_nothing,  # _ACTION_END_OF_LINE is handled by the prompt loop
+    _act_delete,  # _ACTION_DELETE
+    _act_move_right,  # _ACTION_MOVE_RIGHT
+    _act_move_left,  # _ACTION_MOVE_LEFT
+    _act_move_end,  # _ACTION_MOVE_END
+    _act_move_home,  # _ACTION_MOVE_HOME
+)
 
 
 # plink only sends CR (like classic macOS)
 # miniterm sends CRLF on Windows
 # (untested: expecting Linux to send LF)
-def _prompt(message: str, in_stream: BinaryIO, out_stream: BinaryIO, history: InMemoryHistory | None = None) -> str:
-    """Use a custom shell processor to prompt the user with message and return the response."""
-    global _PREVIOUS_ORD  # noqa PLW0603 -- need a global to track EOL characters from Windows across calls in a session
-    out_stream.write(message.encode("UTF-8"))
-
-    key_codes = LineBuffer(prompt_length=len(message))
-    control_codes = []
-    control_pattern = _CONTROL_PATTERN_NONE
-
-    break_loop = False
-    while (not key_codes.has_bytes() or _PREVIOUS_ORD not in [_ORD_CR, _ORD_LF]) and not break_loop:
-        in_bytes = in_stream.read(1)
-        in_ord = in_bytes[0]
-
-        if control_codes:
-            control_pattern = _process_control_sequence(control_codes, in_ord, control_pattern, key_codes, out_stream)
-            # Keep reading more control codes
-            continue
-
-        if in_ord in [_ORD_ESC, _ORD_FKEY_START]:
-            # Begin a control sequence
-            control_codes.append(in_ord)
-            continue
-
-        if in_ord == _ORD_LF and _PREVIOUS_ORD == _ORD_CR:
-            # Throw away the line feed from Windows
-            continue
-
-        if in_ord in [_ORD_CR, _ORD_LF]:
-            # Do not capture or handle EOL characters
-            break_loop = True
-        elif in_ord in _NOOP_ORDS:
-            # No handlers for these
-            pass
-        elif in_ord == _ORD_BACKSPACE:
-            # Handle backspace
-            cursor_column, codes_to_redraw = key_codes.backspace()
-            _hide_cursor(out_stream)
-            _redraw_from_column(cursor_column, codes_to_redraw, out_stream)
-            _set_cursor_column(cursor_column, out_stream)
-            _show_cursor(out_stream)
-        else:
-            # Accept the user's input character
-            old_column = key_codes.get_terminal_column()
-            new_column, codes_to_redraw = key_codes.accept(in_ord)
-            _hide_cursor(out_stream)
-            _redraw_from_column(old_column, codes_to_redraw, out_stream)
-            _set_cursor_column(new_column, out_stream)
-            _show_cursor(out_stream)
-
-        _PREVIOUS_ORD = in_ord
+def _prompt(  # noqa: PLR0913 -- the session passes its state in so the prompt loop has no globals
+    message: str,
+    in_stream: BinaryIO,
+    out_stream: BinaryIO,
+    history: InMemoryHistory | None = None,
+    *,
+    previous_ord: int = _ORD_NUL,
+    message_bytes: bytes | None = None,
+    key_codes: LineBuffer | None = None,
+    reader: _InputReader | None = None,
+) -> tuple[bytes, int]:
+    """
+    Use a custom shell processor to prompt the user with message and return the undecoded response.
+
+    Returns a tuple of the response and the last ordinate read, which the caller passes
+    back as previous_ord on its next call to discard the LF from a Windows CRLF line ending.
+
+    Callers that prompt repeatedly can pass the already-encoded message as message_bytes,
+    a LineBuffer to reuse as key_codes, and an _InputReader that keeps the input read after
+    the end of this line for the next prompt.
+    """
+    out_stream.write(message_bytes if message_bytes is not None else message.encode("UTF-8"))
+
+    if key_codes is None:
+        key_codes = LineBuffer(prompt_length=len(message))
+    else:
+        key_codes.reset(prompt_length=len(message))
+
+    if reader is None:
+        # Nothing keeps the unread input after this line, so leave it in the stream for the next caller
+        reader = _InputReader(in_stream, read_waiting=False)
+
+    # Resolve the names used for every byte once, outside the loop
+    read_input = reader.read
+    transitions = _TRANSITIONS
+    actions = _ACTIONS
+    accept_from = _accept_from
+
+    state = _STATE_TEXT
+    end_of_line = False
+    while not end_of_line:
+        # Pasted input arrives all at once, so step through every byte of each read
+        in_bytes = read_input()
+        if not in_bytes:
+            # A serial port blocks until input arrives, but other streams return nothing at their end
+            exception_message = "read past the end of the input stream"
+            raise IndexError(exception_message)
+        in_length = len(in_bytes)
+        next_index = 0
+        while next_index < in_length:
+            read_index = next_index
+            next_index += 1
+            in_ord = in_bytes[read_index]
+            transition = transitions[state][in_ord]
+            action = transition >> _ACTION_SHIFT
+
+            if action == _ACTION_ACCEPT:
+                # Most input is the user's text, which the text state accepts without changing state
+                next_index = accept_from(in_bytes, read_index, key_codes, out_stream)
+                previous_ord = in_bytes[next_index - 1]
+                continue
+
+            if action == _ACTION_END_OF_LINE:
+                if in_ord == _ORD_LF and previous_ord == _ORD_CR:
+                    # Throw away the line feed from Windows
+                    continue
+                # Do not capture or handle EOL characters
+                previous_ord = in_ord
+                # The rest of the read belongs to the next prompt
+                reader.unread(in_bytes[read_index + 1 :])
+                end_of_line = True
+                break
+
+            if state == _STATE_TEXT and action != _ACTION_NONE:
+                # Remember the user's input, but not the ordinals of control sequences
+                previous_ord = in_ord
+
+            state = transition & _STATE_MASK
+            actions[action](in_ord, key_codes, out_stream)
 
     out_stream.write(b"\n")
 
-    decoded = key_codes.get_decoded_bytes()
-    return decoded
-
-
-def _process_control_sequence(  # noqa: PLR0912 PLR0915 -- we need many lines and statements to process control codes
-    control_codes: list[int], in_ord: int, control_pattern: int, key_codes: LineBuffer, out_stream: BinaryIO
-) -> int:
-    """Track and handle the control codes as they are read."""
-    control_codes.append(in_ord)
-    control_command_length = len(control_codes)
-    if control_command_length == 2:  # noqa: PLR2004 -- this magic number is used as a length, has no separate meaning
-        if control_codes[0] == _ORD_ESC and in_ord == _ORD_OPEN_BRACKET:
-            # Begin escape control sequence, assume cursor move until further reads show otherwise
-            control_pattern = _CONTROL_PATTERN_MOVE_CURSOR_KEY
-        elif control_codes[0] == _ORD_FKEY_START and in_ord == _ORD_LOWER_B:
-            # Begin F-key control sequence, assume lower F-key until further reads show otherwise
-            control_pattern = _CONTROL_PATTERN_LOWER_F_KEY
-        else:
-            # No handlers for other command sequences
-            control_codes.clear()
-    elif control_command_length == 3:  # noqa: PLR2004 -- this magic number is used as a length, has no separate meaning
-        if control_pattern == _CONTROL_PATTERN_MOVE_CURSOR_KEY:
-            if ord("0") <= in_ord <= ord("9"):
-                # We read more and learned we're reading an editor command
-                control_pattern = _CONTROL_PATTERN_EDITOR_KEY
-            else:
-                # We're reading a letter or symbol command ESC[*
-                old_column = key_codes.get_terminal_column()
-                new_column = old_column
-                if in_ord == ord("C"):
-                    new_column = key_codes.move_right()
-                elif in_ord == ord("D"):
-                    new_column = key_codes.move_left()
-                elif in_ord == ord("F"):
-                    new_column = key_codes.move_end()
-                elif in_ord == ord("H"):
-                    new_column = key_codes.move_home()
-
-                if new_column != old_column:
-                    _set_cursor_column(new_column, out_stream)
-
-                # Handling CSI control sequence complete
-                control_pattern = _CONTROL_PATTERN_NONE
-                control_codes.clear()
-        elif control_pattern == _CONTROL_PATTERN_LOWER_F_KEY:
-            if in_ord == _ORD_OPEN_BRACKET:
-                # We read more and learned we're reading an upper F-key command
-                control_pattern = _CONTROL_PATTERN_UPPER_F_KEY
-            else:
-                # No handlers for lower F-key codes
-                pass
-    elif control_command_length == 4:  # noqa: PLR2004 -- this magic number is used as a length, has no separate meaning
-        if control_pattern == _CONTROL_PATTERN_EDITOR_KEY:
-            if in_ord == _ORD_TILDE:
-                if control_codes[2:-1] == [ord("3")]:
-                    # Delete is ESC[3~
-                    cursor_column, codes_to_redraw = key_codes.delete()
-                    _hide_cursor(out_stream)
-                    _redraw_from_column(cursor_column, codes_to_redraw, out_stream)
-                    _set_cursor_column(cursor_column, out_stream)
-                    _show_cursor(out_stream)
-                # Handling complete -- '~' terminated command
-                control_pattern = _CONTROL_PATTERN_NONE
-                control_codes.clear()
-        elif control_pattern == _CONTROL_PATTERN_LOWER_F_KEY:
-            # Handling lower F-key control code complete -- fixed length command
-            control_pattern = _CONTROL_PATTERN_NONE
-            control_codes.clear()
-    else:  # noqa: PLR5501 -- this level of if-else is for branching based on the command sequence length
-        if in_ord == _ORD_TILDE:
-            # Handling upper F-key control code complete -- '~' terminated command
-            control_pattern = _CONTROL_PATTERN_NONE
-            control_codes.clear()
-        else:
-            # No handlers for upper F-key codes
-            pass
-    return control_pattern
+    response = key_codes.get_bytes()
+    return response, previous_ord
@@ -1,11 +1,35 @@
 """Acceptance tests for the discovery module."""
 
+import re
+import sys
+from collections.abc import Iterator
+
 import click
 import pytest
 import serial
 
 from qtpy_datalogger import discovery
 
+# Build the device information once; discovery and the tests only read it
+_QTPY_DEVICE_NO_PSRAM = {
+    "drive_letter": "Q:",
+    "drive_label": "CIRCUITPY",
+    "disk_description": "Adafruit QT Py ESP32S3 no PSRAM",
+    "serial_number": "00AA00AA00AA",
+    "com_port": "COMxx",
+    "com_id": "USB VID:PID=239A:811A SER=00AA00AA00AA LOCATION=1-7:x.0",
+}
+_QTPY_DEVICE_2MB_PSRAM = {
+    "drive_letter": "T:",
+    "drive_label": "CIRCUITPY",
+    "disk_description": "Adafruit QT Py ESP32S3 2MB PSRAM",
+    "serial_number": "11CC11CC11CC",
+    "com_port": "COMyy",
+    "com_id": "USB VID:PID=239A:8144 SER=11CC11CC11CC LOCATION=1-8:x.0",
+}
+_ONE_QTPY_DEVICE = [_QTPY_DEVICE_NO_PSRAM]
+_TWO_QTPY_DEVICES = [_QTPY_DEVICE_NO_PSRAM, _QTPY_DEVICE_2MB_PSRAM]
+
 
 def no_qtpy_devices() -> list[dict[str, str]]:
     """Override discovery.discover_qtpy_devices() to return zero results."""
@@ -14,38 +38,12 @@ def no_qtpy_devices() -> list[dict[str, str]]:
 
 def one_qtpy_device() -> list[dict[str, str]]:
     """Override discovery.discover_qtpy_devices() to return one result."""
-    return [
-        {
-            "drive_letter": "Q:",
-            "drive_label": "CIRCUITPY",
-            "disk_description": "Adafruit QT Py ESP32S3 no PSRAM",
-            "serial_number": "00AA00AA00AA",
-            "com_port": "COMxx",
-            "com_id": "USB VID:PID=239A:811A SER=00AA00AA00AA LOCATION=1-7:x.0",
-        },
-    ]
+    return _ONE_QTPY_DEVICE
 
 
 def two_qtpy_devices() -> list[dict[str, str]]:
     """Override discovery.discover_qtpy_devices() to return two results."""
-    return [
-        {
-            "drive_letter": "Q:",
-            "drive_label": "CIRCUITPY",
-            "disk_description": "Adafruit QT Py ESP32S3 no PSRAM",
-            "serial_number": "00AA00AA00AA",
-            "com_port": "COMxx",
-            "com_id": "USB VID:PID=239A:811A SER=00AA00AA00AA LOCATION=1-7:x.0",
-        },
-        {
-            "drive_letter": "T:",
-            "drive_label": "CIRCUITPY",
-            "disk_description": "Adafruit QT Py ESP32S3 2MB PSRAM",
-            "serial_number": "11CC11CC11CC",
-            "com_port": "COMyy",
-            "com_id": "USB VID:PID=239A:8144 SER=11CC11CC11CC LOCATION=1-8:x.0",
-        },
-    ]
+    return _TWO_QTPY_DEVICES
 
 
 def select_last_from_prompt(text: str, type: click.Choice, default: str, show_default: bool) -> str:  # noqa: A002 -- we must hide 'type' to match the click API
@@ -53,128 +51,141 @@ def select_last_from_prompt(text: str, type: click.Choice, default: str, show_de
     return type.choices[-1]
 
 
+# The messages connect() reports for a port name it rejects and, on Windows, for a port it cannot open
+bad_port_message = "Cannot open a connection to '{}'"
+windows_open_failure_message = (
+    "could not open port '{}': FileNotFoundError(2, 'The system cannot find the file specified.', None, 2)"
+)
+
 # These cases are always true for connect() no matter how many devices have been discovered, 0 to many
-universal_test_cases = [
-    # Arguments:    behavior,   port,   raised_exception,   expected_exit_code
-    # Using --discover-only always exits successfully because --port is ignored
-    (discovery.Behavior.DiscoverOnly, "", SystemExit, discovery._EXIT_SUCCESS),
-    (discovery.Behavior.DiscoverOnly, "COM2", SystemExit, discovery._EXIT_SUCCESS),
-    (discovery.Behavior.DiscoverOnly, "COM1", SystemExit, discovery._EXIT_SUCCESS),
-    (discovery.Behavior.DiscoverOnly, "99", SystemExit, discovery._EXIT_SUCCESS),
+universal_test_cases = (
+    # Arguments:    behavior,   port,   raised_exception,   expected_exit_code,   expected_port
+    # Using --discover-only always exits successfully because --port is ignored, see test_discover_only_ignores_port()
+    (discovery.Behavior.DiscoverOnly, "COM1", SystemExit, discovery._EXIT_SUCCESS, "COM1"),
     # Using '--port COM1' always exits with error because it is not supported
-    (discovery.Behavior.AutoConnect, "COM1", SystemExit, discovery._EXIT_COM1_FAILURE),
+    (discovery.Behavior.AutoConnect, "COM1", SystemExit, discovery._EXIT_COM1_FAILURE, "COM1"),
     # Using a name for --port that doesn't start with 'COM' always exits with error because only Windows is supported
-    (discovery.Behavior.AutoConnect, "88", click.BadParameter, 2),
-]
+    (discovery.Behavior.AutoConnect, "88", click.BadParameter, 2, "88"),
+)
+
+# Each scenario is the devices that discovery finds and what connect() does when --port is not given
+# pytest groups the module-scoped scenarios by position, so list the ones that find a device first
+device_scenarios = {
+    # Arguments:    override,   raised_exception,   expected_exit_code,   expected_port
+    # This exception means connect() tried to correctly open the (monkeypatched) port of the only device
+    "one_device": (
+        one_qtpy_device,
+        serial.SerialException,
+        -1,
+        _QTPY_DEVICE_NO_PSRAM[discovery._INFO_KEY_com_port],
+    ),
+    # This exception means connect() tried to correctly open the (monkeypatched) port of the selected device
+    "two_devices": (
+        two_qtpy_devices,
+        serial.SerialException,
+        -1,
+        _QTPY_DEVICE_2MB_PSRAM[discovery._INFO_KEY_com_port],
+    ),
+    # This exception means connect() failed because no serial ports were discovered
+    "no_devices": (no_qtpy_devices, SystemExit, discovery._EXIT_DISCOVERY_FAILURE, ""),
+}
+
+
+def case_id(test_case: tuple) -> str:
+    """Name a connect() test case by its behavior, port, and expected exception."""
+    behavior, port, raised_exception, expected_exit_code, _ = test_case
+    return f"{behavior.name}-{port or 'no_port'}-{raised_exception.__name__}-{expected_exit_code}"
+
+
+universal_ids = [case_id(test_case) for test_case in universal_test_cases]
+
+
+@pytest.fixture(scope="module")
+def discovered_devices(request: pytest.FixtureRequest) -> Iterator[tuple[type, int, str]]:
+    """Patch discovery once per scenario and return what connect() does when --port is not given."""
+    override, *no_port_outcome = device_scenarios[request.param]
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setattr(discovery, "discover_qtpy_devices", override)
+        monkeypatch.setattr(click, "prompt", select_last_from_prompt)
+        yield tuple(no_port_outcome)
 
 
 def assert_universal_test_cases(excinfo: pytest.ExceptionInfo, expected_exit_code: int, expected_com_port: str) -> None:
     """Validate the output results from the universal_test_cases."""
-    assert excinfo
     exception = excinfo.value
-    exception_type = type(exception)
-    if exception_type is SystemExit:
+    if isinstance(exception, SystemExit):
         assert exception.code == expected_exit_code
-    elif exception_type is click.BadParameter:
+    elif isinstance(exception, click.BadParameter):
         assert exception.exit_code == expected_exit_code
-        assert exception.message == f"Cannot open a connection to '{expected_com_port}'"
+        assert exception.message == bad_port_message.format(expected_com_port)
 
 
-@pytest.mark.parametrize(
-    ("behavior", "port", "raised_exception", "expected_exit_code"),
-    [
-        *universal_test_cases,
-        (
-            discovery.Behavior.AutoConnect,
-            "",
-            SystemExit,
-            discovery._EXIT_DISCOVERY_FAILURE,
-        ),  # This exception means connect() failed because no serial ports were discovered
-    ],
-)
-def test_handle_connect_with_no_devices(
-    monkeypatch: pytest.MonkeyPatch,
+def run_and_assert_connect(
     behavior: discovery.Behavior,
     port: str,
     raised_exception: type,
     expected_exit_code: int,
+    expected_port: str,
 ) -> None:
-    """Does it correctly handle connect() when there are no QT Py devices?"""
-    monkeypatch.setattr(discovery, "discover_qtpy_devices", no_qtpy_devices)
-    expected_port = port
-
-    with pytest.raises(raised_exception) as excinfo:
+    """Call connect() and validate the exception it raises."""
+    # pyserial quotes the port name on Windows but not on POSIX
+    match = (
+        rf"could not open port '?{re.escape(expected_port)}'?:" if raised_exception is serial.SerialException else None
+    )
+    with pytest.raises(raised_exception, match=match) as excinfo:
         discovery.handle_connect(behavior, port)
 
     assert_universal_test_cases(excinfo, expected_exit_code, expected_port)
 
 
+def assert_windows_open_failure(expected_port: str) -> None:
+    """Validate the exact SerialException that pyserial raises on Windows when connect() opens a missing port."""
+    with pytest.raises(serial.SerialException) as excinfo:
+        discovery.handle_connect(discovery.Behavior.AutoConnect, "")
+
+    assert excinfo.value.errno is None
+    assert excinfo.value.args[0] == windows_open_failure_message.format(expected_port)
+
+
+@pytest.mark.parametrize("discovered_devices", device_scenarios, indirect=True, scope="module")
 @pytest.mark.parametrize(
-    ("behavior", "port", "raised_exception", "expected_exit_code"),
-    [
-        *universal_test_cases,
-        (
-            discovery.Behavior.AutoConnect,
-            "",
-            serial.SerialException,
-            -1,
-        ),  # This exception means connect() tried to correctly open the (monkeypatched) port
-    ],
+    ("behavior", "port", "raised_exception", "expected_exit_code", "expected_port"),
+    universal_test_cases,
+    ids=universal_ids,
 )
-def test_handle_connect_with_one_device(
-    monkeypatch: pytest.MonkeyPatch,
+@pytest.mark.usefixtures("discovered_devices")
+def test_handle_connect(
     behavior: discovery.Behavior,
     port: str,
     raised_exception: type,
     expected_exit_code: int,
+    expected_port: str,
 ) -> None:
-    """Does it correctly handle connect() when there is only one QT Py device?"""
-    monkeypatch.setattr(discovery, "discover_qtpy_devices", one_qtpy_device)
-    expected_port = port if port else discovery.discover_qtpy_devices()[0][discovery._INFO_KEY_com_port]
+    """Does it correctly handle connect() no matter how many QT Py devices there are?"""
+    run_and_assert_connect(behavior, port, raised_exception, expected_exit_code, expected_port)
 
-    with pytest.raises(raised_exception) as excinfo:
-        discovery.handle_connect(behavior, port)
 
-    assert_universal_test_cases(excinfo, expected_exit_code, expected_port)
-    if excinfo.value is serial.SerialException:
-        assert excinfo.value.errno is None
-        assert (
-            excinfo.value.args[0]
-            == f"could not open port '{expected_port}': FileNotFoundError(2, 'The system cannot find the file specified.', None, 2)"
-        )
+@pytest.mark.parametrize("discovered_devices", device_scenarios, indirect=True, scope="module")
+def test_handle_connect_without_port(discovered_devices: tuple[type, int, str]) -> None:
+    """Does it open the port of the discovered QT Py device, or fail when there is none?"""
+    raised_exception, expected_exit_code, expected_port = discovered_devices
+    run_and_assert_connect(discovery.Behavior.AutoConnect, "", raised_exception, expected_exit_code, expected_port)
 
 
-@pytest.mark.parametrize(
-    ("behavior", "port", "raised_exception", "expected_exit_code"),
-    [
-        *universal_test_cases,
-        (
-            discovery.Behavior.AutoConnect,
-            "",
-            serial.SerialException,
-            -1,
-        ),  # This exception means connect() tried to correctly open the (monkeypatched) port
-    ],
-)
-def test_handle_connect_with_two_devices(
-    monkeypatch: pytest.MonkeyPatch,
-    behavior: discovery.Behavior,
-    port: str,
-    raised_exception: type,
-    expected_exit_code: int,
-) -> None:
-    """Does it correctly handle connect() when there are two QT Py devices?"""
-    monkeypatch.setattr(discovery, "discover_qtpy_devices", two_qtpy_devices)
-    monkeypatch.setattr(click, "prompt", select_last_from_prompt)
-    expected_port = port if port else two_qtpy_devices()[-1][discovery._INFO_KEY_com_port]
+@pytest.mark.skipif(sys.platform != "win32", reason="pyserial reports a different message and errno on POSIX")
+@pytest.mark.parametrize("discovered_devices", ["one_device", "two_devices"], indirect=True, scope="module")
+def test_open_failure_message(discovered_devices: tuple[type, int, str]) -> None:
+    """Does connect() report why it could not open the discovered QT Py device's port?"""
+    _, _, expected_port = discovered_devices
+    assert_windows_open_failure(expected_port)
 
-    with pytest.raises(raised_exception) as excinfo:
-        discovery.handle_connect(behavior, port)
 
-    assert_universal_test_cases(excinfo, expected_exit_code, expected_port)
-    if excinfo.value is serial.SerialException:
-        assert excinfo.value.errno is None
-        assert (
-            excinfo.value.args[0]
-            == f"could not open port '{expected_port}': FileNotFoundError(2, 'The system cannot find the file specified.', None, 2)"
-        )
+@pytest.mark.parametrize("discovered_devices", device_scenarios, indirect=True, scope="module")
+@pytest.mark.usefixtures("discovered_devices")
+def test_discover_only_ignores_port() -> None:
+    """Does connect() exit successfully with --discover-only no matter which --port is given?"""
+    for port in ("", "COM2", "COM1", "99"):
+        with pytest.raises(SystemExit) as excinfo:
+            discovery.handle_connect(discovery.Behavior.DiscoverOnly, port)
+
+        assert excinfo.value.code == discovery._EXIT_SUCCESS, port
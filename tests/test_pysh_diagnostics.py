@@ -0,0 +1,134 @@
+"""Acceptance tests for the diagnostics module in the pysh module."""
+
+import io
+
+import pytest
+
+from qtpy_sensor_node.snsr.pysh import diagnostics
+
+
+def test_console_query() -> None:
+    """Does it send the query and return the response through the stop ordinal?"""
+    input_buffer = io.BytesIO(initial_bytes=b"\x1b[0nuser input")
+    output_buffer = io.BytesIO(initial_bytes=b"")
+
+    response = diagnostics.console_query(
+        query_sequence=b"\x1b[5n", out_stream=output_buffer, in_stream=input_buffer, stop_ord=ord("n")
+    )
+
+    assert output_buffer.getvalue() == b"\x1b[5n"
+    assert response == b"\x1b[0n"
+    assert input_buffer.read() == b"user input"
+
+
+class _SerialInput(io.BytesIO):
+    """A stand-in for pyserial's Serial, which can read through a terminator in one call."""
+
+    read_until_count = 0
+
+    def read_until(self, expected: bytes) -> bytes:
+        self.read_until_count += 1
+        response = bytearray()
+        while not response.endswith(expected):
+            response.extend(self.read(1))
+        return bytes(response)
+
+
+def test_console_query_read_until() -> None:
+    """Does it read the whole response through the stop ordinal with read_until when the stream has it?"""
+    input_buffer = _SerialInput(initial_bytes=b"\x1b[0nuser input")
+    output_buffer = io.BytesIO(initial_bytes=b"")
+
+    response = diagnostics.console_query(
+        query_sequence=b"\x1b[5n", out_stream=output_buffer, in_stream=input_buffer, stop_ord=ord("n")
+    )
+
+    assert input_buffer.read_until_count == 1
+    assert response == b"\x1b[0n"
+    assert input_buffer.read() == b"user input"
+
+
+def test_get_cursor_position() -> None:
+    """Does it parse the row and column from the console's cursor position report?"""
+    input_buffer = io.BytesIO(initial_bytes=b"\x1b[12;34R")
+    output_buffer = io.BytesIO(initial_bytes=b"")
+
+    position = diagnostics.get_cursor_position(output_buffer, input_buffer)
+
+    assert output_buffer.getvalue() == b"\x1b[6n"
+    assert position == (12, 34)
+
+
+def test_get_cursor_column() -> None:
+    """Does it return only the column from the console's cursor position report?"""
+    expected_column = 34
+    input_buffer = io.BytesIO(initial_bytes=b"\x1b[12;34Ruser input")
+    output_buffer = io.BytesIO(initial_bytes=b"")
+
+    column = diagnostics.get_cursor_column(output_buffer, input_buffer)
+
+    assert column == expected_column
+    assert output_buffer.getvalue() == b"\x1b[6n"
+    assert input_buffer.read() == b"user input"
+
+
+@pytest.mark.parametrize(
+    ("char_ord", "expected_printable"),
+    [
+        (-1, False),
+        (0x00, False),
+        (0x1F, False),
+        (ord(" "), True),
+        (ord("~"), True),
+        (0x7F, False),
+        (0xFF, False),
+        (0x100, False),
+    ],
+)
+def test_is_printable(char_ord: int, expected_printable: bool) -> None:
+    """Does it classify only the ASCII characters from space to tilde as printable?"""
+    assert diagnostics.is_printable(char_ord) == expected_printable
+
+
+@pytest.mark.parametrize(
+    ("in_ordinal", "expected_str"),
+    [
+        (0x09, "TAB"),
+        (0x1B, "ESC"),
+        (0x02, "?"),
+        (ord("A"), "A"),
+        (ord("~"), "~"),
+        (0x7F, "DEL"),
+        (0xFF, "?"),
+        (0x100, "?"),
+        (ord("•"), "?"),
+        (-1, "?"),
+        (-247, "?"),
+    ],
+)
+def test_debug_str(in_ordinal: int, expected_str: str) -> None:
+    """Does it show printable characters as themselves, name known control codes, and substitute '?' for the rest?"""
+    assert diagnostics.debug_str(in_ordinal) == expected_str
+
+
+def test_traced_io() -> None:
+    """Does it log the bytes read from and written to the streams?"""
+    input_buffer = io.BytesIO(initial_bytes=b"A")
+    output_buffer = io.BytesIO(initial_bytes=b"")
+    tracer = diagnostics.IOTracer(input_stream=input_buffer, output_stream=output_buffer)
+
+    tracer.output_stream.write(tracer.input_stream.read(1))
+
+    assert output_buffer.getvalue() == b"A"
+    assert tracer.traced_io_log[-2:] == [" in   b'A'", "out > b'A'"]
+
+
+def test_disabled_tracer() -> None:
+    """Does it pass the original streams through without logging?"""
+    input_buffer = io.BytesIO(initial_bytes=b"A")
+    output_buffer = io.BytesIO(initial_bytes=b"")
+    tracer = diagnostics.IOTracer(input_stream=input_buffer, output_stream=output_buffer, enabled=False)
+
+    assert tracer.input_stream is input_buffer
+    assert tracer.output_stream is output_buffer
+    assert not tracer.traced_io_log
@@ -22,6 +22,22 @@ def test_initial_value(prompt_length: int) -> None:
     assert not buffy.get_decoded_bytes()
 
 
+def test_reset() -> None:
+    """Does it return to its initial state for a new prompt?"""
+    buffy = LineBuffer(prompt_length=0)
+    for ord_code in b"1234\tabcd":
+        buffy.accept(ord_code)
+    buffy.move_left()
+
+    prompt_length = len("qtpy $ ")
+    buffy.reset(prompt_length=prompt_length)
+
+    assert buffy.input_cursor == 0
+    assert buffy.get_terminal_column() == 1 + prompt_length
+    assert not buffy.has_bytes()
+    assert not buffy.get_decoded_bytes()
+
+
 @pytest.mark.parametrize(
     ("input_characters", "expected_column"),
     [
@@ -37,8 +53,8 @@ def test_accept_characters(input_characters: str, expected_column: int) -> None:
     prompt_length = 0
     buffy = LineBuffer(prompt_length=prompt_length)
 
-    for character in list(input_characters):
-        buffy.accept(ord(character))
+    for ord_code in input_characters.encode():
+        buffy.accept(ord_code)
 
     assert buffy.input_cursor == len(input_characters)
     assert buffy.get_terminal_column() == expected_column
@@ -46,6 +62,41 @@ def test_accept_characters(input_characters: str, expected_column: int) -> None:
     assert buffy.get_decoded_bytes() == input_characters
 
 
+@pytest.mark.parametrize(
+    ("input_characters", "left_moves", "pasted_characters", "expected_column", "expected_buffer"),
+    [
+        ("", 0, "1234\tabcd", 13, "1234\tabcd"),
+        ("1234", 0, "\tabcd", 13, "1234\tabcd"),
+        ("abcd", 4, "1234\t", 9, "1234\tabcd"),
+        ("aeio2468\t", 5, "\t", 9, "aeio\t2468\t"),
+        ("abcd", 2, "", 3, "abcd"),
+    ],
+)
+def test_accept_many(
+    input_characters: str, left_moves: int, pasted_characters: str, expected_column: int, expected_buffer: str
+) -> None:
+    """Does it insert several characters at the input cursor as if each were accepted in turn?"""
+    prompt_length = 0
+    buffy = LineBuffer(prompt_length=prompt_length)
+    for ord_code in input_characters.encode():
+        buffy.accept(ord_code)
+    for _ in range(left_moves):
+        buffy.move_left()
+
+    new_column, remaining_line = buffy.accept_many(pasted_characters.encode())
+
+    assert new_column == expected_column
+    assert buffy.get_terminal_column() == expected_column
+    assert buffy.input_cursor == len(input_characters) - left_moves + len(pasted_characters)
+    assert bytes(remaining_line) == expected_buffer[buffy.input_cursor - len(pasted_characters) :].encode()
+    assert buffy.get_decoded_bytes() == expected_buffer
+    # The columns after the pasted characters match those of a buffer typed one character at a time
+    typed_buffy = LineBuffer(prompt_length=prompt_length)
+    for ord_code in expected_buffer.encode():
+        typed_buffy.accept(ord_code)
+    assert buffy.move_end() == typed_buffy.get_terminal_column()
+
+
 @pytest.mark.parametrize(
     ("input_characters"),
     [
@@ -59,8 +110,8 @@ def test_move_home(input_characters: str) -> None:
     """Does it correctly move the input cursor home?"""
     prompt_length = 0
     buffy = LineBuffer(prompt_length=prompt_length)
-    for character in list(input_characters):
-        buffy.accept(ord(character))
+    for ord_code in input_characters.encode():
+        buffy.accept(ord_code)
 
     # LineBuffer.move_home() can be called many times without changing the buffer's state
     for _ in range(2):
@@ -85,8 +136,8 @@ def test_move_end(input_characters: str, expected_column: int) -> None:
     prompt_length = 0
     buffy = LineBuffer(prompt_length=prompt_length)
     expected_cursor_position = len(input_characters)
-    for character in list(input_characters):
-        buffy.accept(ord(character))
+    for ord_code in input_characters.encode():
+        buffy.accept(ord_code)
     buffy.move_home()
 
     # LineBuffer.move_end() can be called many times without changing the buffer's state
@@ -119,8 +170,8 @@ def test_move_left(input_characters: str, expected_cursor_and_column_after_move:
     """Does it correctly move the input cursor left?"""
     prompt_length = 0
     buffy = LineBuffer(prompt_length=prompt_length)
-    for character in list(input_characters):
-        buffy.accept(ord(character))
+    for ord_code in input_characters.encode():
+        buffy.accept(ord_code)
 
     for expected_column_and_cursor in expected_cursor_and_column_after_move:
         expected_cursor = expected_column_and_cursor[0]
@@ -153,8 +204,8 @@ def test_move_right(input_characters: str, expected_cursor_and_column_after_move
     """Does it correctly move the input cursor right?"""
     prompt_length = 0
     buffy = LineBuffer(prompt_length=prompt_length)
-    for character in list(input_characters):
-        buffy.accept(ord(character))
+    for ord_code in input_characters.encode():
+        buffy.accept(ord_code)
     buffy.move_home()
 
     for expected_column_and_cursor in expected_cursor_and_column_after_move:
@@ -179,8 +230,8 @@ def test_delete(input_characters: str, left_moves: int, expected_column: int, ex
     """Does it correctly delete characters at the input cursor?"""
     prompt_length = 0
     buffy = LineBuffer(prompt_length=prompt_length)
-    for character in list(input_characters):
-        buffy.accept(ord(character))
+    for ord_code in input_characters.encode():
+        buffy.accept(ord_code)
     for _ in range(left_moves):
         buffy.move_left()
 
@@ -203,8 +254,8 @@ def test_backspace(input_characters: str, left_moves: int, expected_column: int,
     """Does it correctly backspace characters before the input cursor?"""
     prompt_length = 0
     buffy = LineBuffer(prompt_length=prompt_length)
-    for character in list(input_characters):
-        buffy.accept(ord(character))
+    for ord_code in input_characters.encode():
+        buffy.accept(ord_code)
     for _ in range(left_moves):
         buffy.move_left()
 
@@ -233,8 +284,8 @@ def test_line_navigation(
     """Does it handle multiple move commands correctly?"""
     prompt_length = 0
     buffy = LineBuffer(prompt_length=prompt_length)
-    for character in list(input_characters):
-        buffy.accept(ord(character))
+    for ord_code in input_characters.encode():
+        buffy.accept(ord_code)
 
     new_column = -1
     for move_call in move_calls:
@@ -264,8 +315,8 @@ def test_line_editing(
     """Does it handle multiple move and edit commands correctly?"""
     prompt_length = 0
     buffy = LineBuffer(prompt_length=prompt_length)
-    for character in list(input_characters):
-        buffy.accept(ord(character))
+    for ord_code in input_characters.encode():
+        buffy.accept(ord_code)
 
     for buffer_call in buffer_calls:
         do_call = getattr(buffy, buffer_call)
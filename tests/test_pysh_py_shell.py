@@ -1,32 +1,40 @@
 """Acceptance tests for the py_shell module."""
 
 import io
-import itertools
+from types import MappingProxyType
 
 import pytest
 
 from qtpy_sensor_node.snsr.pysh import py_shell
 
-_CODES_FOR_KEY_NAME = {
-    "left arrow": b"\x1b[D",
-    "right arrow": b"\x1b[C",
-    "up arrow": b"\x1b[A",
-    "down arrow": b"\x1b[B",
-    "home": b"\x1b[H",
-    "end": b"\x1b[F",
-    "backspace": b"\x08",
-    "delete": b"\x1b[3~",
-    "F1": b"\x01bOP",
-    "F2": b"\x01bOQ",
-    "F3": b"\x01bOR",
-    "F4": b"\x01bOS",
-    "F5": b"\x01b[15~",
-    "F6": b"\x01b[17~",
-    "F7": b"\x01b[18~",
-    "F8": b"\x01b[19~",
-    "F9": b"\x01b[20~",
-    "F10": b"\x01b[21~",
-}
+# Every test reads this table, so freeze it to keep one test from changing the keys another test sends
+_CODES_FOR_KEY_NAME = MappingProxyType(
+    {
+        "left arrow": b"\x1b[D",
+        "right arrow": b"\x1b[C",
+        "up arrow": b"\x1b[A",
+        "down arrow": b"\x1b[B",
+        "home": b"\x1b[H",
+        "end": b"\x1b[F",
+        "backspace": b"\x08",
+        "delete": b"\x1b[3~",
+        "F1": b"\x01bOP",
+        "F2": b"\x01bOQ",
+        "F3": b"\x01bOR",
+        "F4": b"\x01bOS",
+        "F5": b"\x01b[15~",
+        "F6": b"\x01b[17~",
+        "F7": b"\x01b[18~",
+        "F8": b"\x01b[19~",
+        "F9": b"\x01b[20~",
+        "F10": b"\x01b[21~",
+    }
+)
+
+
+def keyboard_input(user_input: str, key_names: list[str], eol_bytes: bytes) -> bytes:
+    """Return the bytes a console sends when the user types user_input, presses the named keys, then ends the line."""
+    return b"".join([user_input.encode("UTF-8"), *[_CODES_FOR_KEY_NAME[key_name] for key_name in key_names], eol_bytes])
 
 
 def test_custom_shell_prompt() -> None:
@@ -70,6 +78,104 @@ def test_prompt_exits_on_eol(in_eol_bytes: bytes, assert_message: str) -> None:
     assert len(response) == 0
 
 
+@pytest.mark.parametrize(
+    ("in_eol_bytes", "assert_message"),
+    [
+        (b"\n", "Linux EOL failed to separate responses"),
+        (b"\r", "Classic macOS EOL failed to separate responses"),
+        (b"\r\n", "Windows EOL failed to separate responses"),
+    ],
+)
+def test_session_prompts_across_eol(in_eol_bytes: bytes, assert_message: str) -> None:
+    """Does it return one response per line when the session prompts more than once?"""
+    shell_prompt = "qtpy $"
+    responses = ["first", "second"]
+    session_input = b"".join(response.encode("UTF-8") + in_eol_bytes for response in responses)
+    input_buffer = io.BytesIO(initial_bytes=session_input)
+    output_buffer = io.BytesIO(initial_bytes=b"")
+    prompt_session = py_shell.PromptSession(in_stream=input_buffer, out_stream=output_buffer)
+
+    actual_responses = [prompt_session.prompt(message=shell_prompt) for _ in responses]
+    assert actual_responses == responses, assert_message
+
+
+class _SerialInput:
+    """A stand-in for a serial port that reports in_waiting and delivers its input in fixed reads."""
+
+    def __init__(self, reads: list[bytes]) -> None:
+        self._reads = reads
+
+    @property
+    def in_waiting(self) -> int:
+        return len(self._reads[0]) if self._reads else 0
+
+    def read(self, byte_count: int) -> bytes:
+        assert byte_count == self.in_waiting, "Expected to read every waiting byte at once"
+        return self._reads.pop(0)
+
+
+def test_session_keeps_input_after_eol() -> None:
+    """Does it hand the input read past the end of a line to the next prompt?"""
+    shell_prompt = "qtpy $"
+    # The second read holds the LF of the first line's CRLF and two more lines
+    input_stream = _SerialInput([b"first\r", b"\nsecond\r\nthird\r"])
+    output_buffer = io.BytesIO(initial_bytes=b"")
+    prompt_session = py_shell.PromptSession(in_stream=input_stream, out_stream=output_buffer)  # type: ignore -- duck-typed serial port
+
+    actual_responses = [prompt_session.prompt(message=shell_prompt) for _ in range(3)]
+    assert actual_responses == ["first", "second", "third"]
+    assert not input_stream.in_waiting
+
+
+@pytest.mark.parametrize(
+    ("reads", "expected_response", "expected_output"),
+    [
+        (  # Pasting at the end of the line echoes the pasted text as-is
+            [b"abc def\r"],
+            "abc def",
+            b"qtpy $abc def\n",
+        ),
+        (  # Pasting inside the line redraws the rest of the line once
+            [b"ad", b"\x1b[D", b"bc\r"],
+            "abcd",
+            b"qtpy $ad\x1b[D\x1b[?25l\x1b[8G\x1b[0Kbcd\x1b[10G\x1b[?25h\n",
+        ),
+    ],
+)
+def test_session_pasted_input(reads: list[bytes], expected_response: str, expected_output: bytes) -> None:
+    """Does it accept pasted text that arrives in one read as a single edit?"""
+    shell_prompt = "qtpy $"
+    input_stream = _SerialInput(reads)
+    output_buffer = io.BytesIO(initial_bytes=b"")
+    prompt_session = py_shell.PromptSession(in_stream=input_stream, out_stream=output_buffer)  # type: ignore -- duck-typed serial port
+
+    response = prompt_session.prompt(message=shell_prompt)
+
+    assert response == expected_response
+    assert output_buffer.getvalue() == expected_output
+
+
+class _WaitingInput(io.BytesIO):
+    """A stand-in for usb_cdc.Serial, which reports every unread byte as waiting."""
+
+    @property
+    def in_waiting(self) -> int:
+        return len(self.getbuffer()) - self.tell()
+
+
+def test_prompt_leaves_input_after_eol() -> None:
+    """Does the module-level prompt leave the input after the end of a line in the stream for the next call?"""
+    shell_prompt = "qtpy $"
+    input_stream = _WaitingInput(initial_bytes=b"first\rsecond\r")
+    output_buffer = io.BytesIO(initial_bytes=b"")
+
+    actual_responses = [
+        py_shell.prompt(message=shell_prompt, in_stream=input_stream, out_stream=output_buffer) for _ in range(2)
+    ]
+    assert actual_responses == ["first", "second"]
+    assert not input_stream.in_waiting
+
+
 def test_printable_input() -> None:
     """Does it echo printable user input back to the sender?"""
     shell_prompt = "qtpy $"
@@ -79,14 +185,60 @@ def test_printable_input() -> None:
     prompt_session = py_shell.PromptSession(in_stream=input_buffer, out_stream=output_buffer)
     response = prompt_session.prompt(message=shell_prompt)
 
-    # Room for improvement here -- rather than redrawing the most recent character when at the end of the buffer, just append it
-    expected_output = b"qtpy $\x1b[?25l\x1b[7G\x1b[0K!\x1b[8G\x1b[?25h\x1b[?25l\x1b[8G\x1b[0K'\x1b[9G\x1b[?25h\x1b[?25l\x1b[9G\x1b[0K#\x1b[10G\x1b[?25h\x1b[?25l\x1b[10G\x1b[0K \x1b[11G\x1b[?25h\x1b[?25l\x1b[11G\x1b[0K0\x1b[12G\x1b[?25h\x1b[?25l\x1b[12G\x1b[0K1\x1b[13G\x1b[?25h\x1b[?25l\x1b[13G\x1b[0K2\x1b[14G\x1b[?25h\x1b[?25l\x1b[14G\x1b[0K \x1b[15G\x1b[?25h\x1b[?25l\x1b[15G\x1b[0KA\x1b[16G\x1b[?25h\x1b[?25l\x1b[16G\x1b[0KB\x1b[17G\x1b[?25h\x1b[?25l\x1b[17G\x1b[0KC\x1b[18G\x1b[?25h\x1b[?25l\x1b[18G\x1b[0K \x1b[19G\x1b[?25h\x1b[?25l\x1b[19G\x1b[0Ka\x1b[20G\x1b[?25h\x1b[?25l\x1b[20G\x1b[0Kb\x1b[21G\x1b[?25h\x1b[?25l\x1b[21G\x1b[0Kc\x1b[22G\x1b[?25h\x1b[?25l\x1b[22G\x1b[0K \x1b[23G\x1b[?25h\x1b[?25l\x1b[23G\x1b[0K~\x1b[24G\x1b[?25h\n"
+    expected_output = b"qtpy $!'# 012 ABC abc ~\n"
     actual_output = output_buffer.getvalue()
     assert len(actual_output) > 0
     assert actual_output == expected_output
     assert response == printable_input.decode("UTF-8").strip()
 
 
+def test_input_inside_line() -> None:
+    """Does it redraw the rest of the line when the user types before its end?"""
+    shell_prompt = "qtpy $"
+    input_buffer = io.BytesIO(initial_bytes=b"ac" + _CODES_FOR_KEY_NAME["left arrow"] + b"b\r")
+    output_buffer = io.BytesIO(initial_bytes=b"")
+    prompt_session = py_shell.PromptSession(in_stream=input_buffer, out_stream=output_buffer)
+    response = prompt_session.prompt(message=shell_prompt)
+
+    expected_output = b"qtpy $ac\x1b[D\x1b[?25l\x1b[8G\x1b[0Kbc\x1b[9G\x1b[?25h\n"
+    actual_output = output_buffer.getvalue()
+    assert actual_output == expected_output
+    assert response == "abc"
+
+
+@pytest.mark.parametrize(
+    ("user_input", "input_key", "expected_move_bytes"),
+    [
+        ("a", "left arrow", b"\x1b[D"),
+        ("a", "home", b"\x1b[D"),
+        ("ab", "home", b"\x1b[7G"),
+        ("\t", "left arrow", b"\x1b[7G"),
+    ],
+)
+def test_cursor_move_output(user_input: str, input_key: str, expected_move_bytes: bytes) -> None:
+    """Does it send the short control sequence for one-column moves and set the column for longer ones?"""
+    shell_prompt = "qtpy $"
+    input_buffer = io.BytesIO(initial_bytes=keyboard_input(user_input, [input_key], b"\r"))
+    output_buffer = io.BytesIO(initial_bytes=b"")
+    prompt_session = py_shell.PromptSession(in_stream=input_buffer, out_stream=output_buffer)
+    _ = prompt_session.prompt(message=shell_prompt)
+
+    actual_output = output_buffer.getvalue()
+    assert actual_output.endswith(expected_move_bytes + b"\n")
+
+
+def test_prompt_bytes() -> None:
+    """Does it return the user's response without decoding it?"""
+    shell_prompt = "qtpy $"
+    user_input = "read 25\u00b0C"
+    input_buffer = io.BytesIO(initial_bytes=user_input.encode("UTF-8") + b"\r")
+    output_buffer = io.BytesIO(initial_bytes=b"")
+    prompt_session = py_shell.PromptSession(in_stream=input_buffer, out_stream=output_buffer)
+    response = prompt_session.prompt_bytes(message=shell_prompt)
+
+    assert response == user_input.encode("UTF-8")
+
+
 @pytest.mark.parametrize(
     ("input_key", "additional_expected_output_bytes"),
     [
@@ -156,14 +308,7 @@ def test_nonprintable_input_key(input_key: str, additional_expected_output_bytes
 def test_line_editing(user_input: str, input_command_sequence: list[str], expected_response: str) -> None:
     """Does it correctly handle line editing commands?"""
     shell_prompt = "qtpy $"
-    user_input_bytes = user_input.encode("UTF-8")
-    navigation_input_bytes = [_CODES_FOR_KEY_NAME[navkey] for navkey in input_command_sequence]
-    complete_input = bytearray(user_input_bytes)
-    complete_input.extend(itertools.chain.from_iterable(navigation_input_bytes))
-    complete_input.extend(b"\r\n")
-    complete_input_bytes = bytes(complete_input)
-
-    input_buffer = io.BytesIO(initial_bytes=complete_input_bytes)
+    input_buffer = io.BytesIO(initial_bytes=keyboard_input(user_input, input_command_sequence, b"\r\n"))
     output_buffer = io.BytesIO(initial_bytes=b"")
     prompt_session = py_shell.PromptSession(in_stream=input_buffer, out_stream=output_buffer)
     response = prompt_session.prompt(message=shell_prompt)
@@ -172,3 +317,25 @@ def test_line_editing(user_input: str, input_command_sequence: list[str], expect
     assert len(actual_output) > 0
     assert len(response) > 0
     assert response == expected_response
+
+
+def test_history_is_bounded() -> None:
+    """Does it keep only the most recent commands?"""
+    max_entries = 3
+    history = py_shell.InMemoryHistory(max_entries=max_entries)
+
+    commands = [f"command {index}" for index in range(5)]
+    for command in commands:
+        history.append_string(command)
+
+    assert history.get_strings() == commands[-max_entries:]
+
+
+def test_history_moves_repeated_commands() -> None:
+    """Does it keep one entry per command, ordered by the most recent use?"""
+    history = py_shell.InMemoryHistory(max_entries=3)
+
+    for command in ["ls", "pwd", "ls", "cd", "ls"]:
+        history.append_string(command)
+
+    assert history.get_strings() == ["pwd", "cd", "ls"]